@@ -21,7 +21,7 @@ License:
     OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
     SOFTWARE.
 """
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, ValuesView
 from enum import Enum
 
 import textwrap
@@ -133,11 +133,14 @@ class RegistryValue:
         return ( (self.name.lower() == other.name.lower()) and (str(self.data) == str(other.data)) and (self.data_type == other.data_type) )
 
     def __hash__(self):
-        return hash((self.name.lower(), self.data, self.data_type))
+        # Must agree with __eq__, which compares the data by its string representation
+        return hash((self.name.lower(), str(self.data), self.data_type))
 
 
 class RegistryKey(object):
     """Represents a registry key."""
+
+    __slots__ = ("name", "_sub_keys", "_values", "_is_explicit", "_parent", "_fingerprint")
     
     def __init__(self, name: str):
         """Instantiate a registry key.
@@ -158,14 +161,20 @@ class RegistryKey(object):
         # True if the key was explicitly requested
         self._is_explicit = False
 
+        # The key this key was added to, if any
+        self._parent: Optional[RegistryKey] = None
+
+        # Cached hash of the key contents, see 'fingerprint'
+        self._fingerprint: Optional[int] = None
+
     @property
-    def sub_keys(self) -> List["RegistryKey"]:
-        """The child-keys of this key."""
+    def sub_keys(self) -> ValuesView["RegistryKey"]:
+        """The child-keys of this key, as a live view (no copy is made)."""
         return self._sub_keys.values()
 
     @property
-    def values(self) -> List[RegistryValue]:
-        """The values that belong to this key."""
+    def values(self) -> ValuesView[RegistryValue]:
+        """The values that belong to this key, as a live view (no copy is made)."""
         return self._values.values()
 
     @property
@@ -190,6 +199,25 @@ class RegistryKey(object):
             raise ValueError("is_explicit must be boolean!")
         self._is_explicit = value
 
+    @property
+    def fingerprint(self) -> int:
+        """A hash of the contents (child-keys and values) of this key.
+
+        Computed once and cached until this key or one of its descendants is modified.
+        Keys which are equal always have the same fingerprint.
+        """
+        if self._fingerprint is None:
+            self._fingerprint = hash((frozenset((name, sub_key.fingerprint) for name, sub_key in self._sub_keys.items()), 
+                                      frozenset(self._values.items())))
+        return self._fingerprint
+
+    def _invalidate_fingerprint(self) -> None:
+        """Clear the cached fingerprint of this key and of all its ancestors."""
+        key = self
+        while key is not None and key._fingerprint is not None:
+            key._fingerprint = None
+            key = key._parent
+
     def _add_sub_key(self, sub_key: 'RegistryKey') -> None:
         """Add a direct child-key to this key.
         
@@ -201,6 +229,8 @@ class RegistryKey(object):
         if name_lower in self._sub_keys:
             raise RuntimeError(f"Error: '{name_lower}' already exists in '{self.name}'")
         self._sub_keys[sub_key.name.lower()] = sub_key
+        sub_key._parent = self
+        self._invalidate_fingerprint()
 
     def get_sub_key(self, sub_key_name: str, create_if_missing: bool = False) -> "RegistryKey":
         """Return a direct child-key of this key, by its name.
@@ -235,6 +265,7 @@ class RegistryKey(object):
         if name_lower in self._values:
             raise RuntimeError(f"Error: '{name_lower}' already exists in '{self.name}'")
         self._values[name_lower] = value
+        self._invalidate_fingerprint()
 
     def __str__(self) -> str:
         res = "{} {{\n".format(self.name)
@@ -276,4 +307,11 @@ class RegistryKey(object):
         if not isinstance(other, RegistryKey):
             return False
 
+        if self is other:
+            return True
+
+        # Different fingerprints mean different contents, equal ones might still be a collision
+        if self.fingerprint != other.fingerprint:
+            return False
+
         return ( (self._sub_keys == other._sub_keys) and (self._values == other._values) )
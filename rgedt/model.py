@@ -24,6 +24,7 @@ License:
 
 from typing import List, Tuple, Optional, Set, Any
 import re
+import sys
 
 from . import registry
 from .common import *
@@ -47,8 +48,8 @@ class Model(object):
         "REG_DWORD": 0
     }
     
-    # Regular expression to check if the key path starts with a hive acronym
-    _ROOT_KEY_SHORT_REGEX =  re.compile("^(" + r")|^(".join(_ROOT_KEY_SHORT.keys()) + ")")
+    # Regular expression to check if the key path starts with a hive acronym (as a complete key name)
+    _ROOT_KEY_SHORT_REGEX =  re.compile("^(" + "|".join(_ROOT_KEY_SHORT.keys()) + r")(?=\\|$)")
     
     # The implicit root key prepended to any key path
     _COMPUTER_ROOT_STR = "Computer"
@@ -65,6 +66,11 @@ class Model(object):
         # If None, the local computer is used.
         self.computer_name      = config.get("computer_name", None)
 
+        # Whether to intern the names of keys and values read while building the registry tree.
+        # The same names (e.g. "Software", "Microsoft") repeat throughout the registry, so 
+        # interning saves memory and speeds up name comparisons for large trees.
+        self.intern_names       = config.get("intern_names", True)
+
     def get_registry_tree(self, key_paths: List[str]) -> RegistryKey:
         """Given a list of key paths, return a representation of the registry
            tree where on one hand, all the keys and values under the given 
@@ -184,14 +190,24 @@ class Model(object):
             current_key_name = current_key.name
 
         current_key.is_explicit = True
+
+        # This method runs once per key in the tree, look up the functions once per call
+        winreg = registry.winreg
+        enum_key, enum_value = winreg.EnumKey, winreg.EnumValue
+        intern_names = self.intern_names
             
-        with registry.winreg.OpenKey(base_key_handle, current_key_name) as sub_key_handle:
-            num_sub_keys, num_values, _ = registry.winreg.QueryInfoKey(sub_key_handle)
+        with winreg.OpenKey(base_key_handle, current_key_name) as sub_key_handle:
+            num_sub_keys, num_values, _ = winreg.QueryInfoKey(sub_key_handle)
             for i in range(num_sub_keys):
-                new_key = current_key.get_sub_key(registry.winreg.EnumKey(sub_key_handle, i), create_if_missing = True)
+                sub_key_name = enum_key(sub_key_handle, i)
+                if intern_names:
+                    sub_key_name = sys.intern(sub_key_name)
+                new_key = current_key.get_sub_key(sub_key_name, create_if_missing = True)
                 self._build_subkey_structure(sub_key_handle, new_key)
             for i in range(num_values):
-                name, value, key_type = registry.winreg.EnumValue(sub_key_handle, i)
+                name, value, key_type = enum_value(sub_key_handle, i)
+                if intern_names:
+                    name = sys.intern(name)
                 val_obj = RegistryValue(name = name, data = value, data_type = key_type)
                 current_key.add_value(val_obj)
         
@@ -224,22 +240,25 @@ class Model(object):
         
         # Helper method to expand a hive acronym (as a regex match) to its official name
         def expand_root_key(match: re.Match) -> str:
-            return cls._ROOT_KEY_SHORT.get(match.group(1), match.group(1))
+            return cls._ROOT_KEY_SHORT[match.group(1)]
 
         expanded_key_paths = []
 
         for key_path in key_paths:
             key_path = cls._normalize_key_string(key_path)
-            expanded_key_paths.append(cls._ROOT_KEY_SHORT_REGEX.sub(expand_root_key, key_path).rstrip(REGISTRY_PATH_SEPARATOR))
+            expanded_key_paths.append(cls._ROOT_KEY_SHORT_REGEX.sub(expand_root_key, key_path, count = 1).rstrip(REGISTRY_PATH_SEPARATOR))
 
-        sorted_paths = list(sorted(expanded_key_paths))
-        res = set()
+        # Sort the paths by their key names (and not as plain strings, where e.g. "A B" falls between "A" and "A\X").
+        # This way, the paths contained in a path immediately follow it, so a single pass over the list is enough.
+        sorted_paths = sorted(set(tuple(key_path.split(REGISTRY_PATH_SEPARATOR)) for key_path in expanded_key_paths))
 
-        while (len(sorted_paths) > 0):
-            current_path = sorted_paths.pop(0)
-            res.add(current_path)
-            while ( (len(sorted_paths) > 0) and (sorted_paths[0].startswith(current_path)) ):
-                sorted_paths.pop(0)
+        res = set()
+        last_kept = None
+        for key_names in sorted_paths:
+            if last_kept is not None and key_names[:len(last_kept)] == last_kept:
+                continue
+            res.add(REGISTRY_PATH_SEPARATOR.join(key_names))
+            last_kept = key_names
 
         return res
 
@@ -377,6 +396,10 @@ class Model(object):
             name:
                 Name of new key.
         """
+        if REGISTRY_PATH_SEPARATOR in name:
+            # winreg would create a whole path of keys
+            raise RgEdtException(f"Key name '{name}' can't contain '{REGISTRY_PATH_SEPARATOR}'")
+
         key = self._normalize_key_string(key)
         try:
             root_key_const, rest_of_key = self._split_key(key)
@@ -36,9 +36,12 @@ from .. import model
 from .. import common
 
 def _traverse_keys(root: common.RegistryKey):
-    for subkey in root.sub_keys:
-        yield subkey
-        yield from _traverse_keys(subkey)
+    stack = [root]
+    while stack:
+        key = stack.pop()
+        for subkey in key.sub_keys:
+            yield subkey
+            stack.append(subkey)
 
 def xml_to_key(xml):
     element = ET.fromstring(xml)
@@ -101,6 +104,13 @@ class TestModel(unittest.TestCase):
         """
         self.assertNotEqual(xml_to_key(expected_xml), tree)
 
+    def test_inequality_after_modification(self):
+        tree1 = self.model.get_registry_tree([r"HKEY_CLASSES_ROOT\.386"])
+        tree2 = xml_to_key(tree1.to_xml())
+        self.assertEqual(tree1, tree2)
+        tree2.get_sub_key("HKEY_CLASSES_ROOT").get_sub_key(".386").add_value(model.RegistryValue("New", "data", registry.winreg.REG_SZ))
+        self.assertNotEqual(tree1, tree2)
+
     def path_len_test(self, path):
         tree = self.model.get_registry_tree([path])
         expected_xml = """
@@ -215,6 +225,16 @@ class TestModel(unittest.TestCase):
 
         self.assertEqual(expected, res)
 
+    def test_remove_contained_paths_all_abbreviations(self):
+        paths = [r"HKCR\.386", r"HKCU\SOFTWARE", r"HKLM\SOFTWARE", r"HKU", r"HKCC\System", r"HKCUX\SOFTWARE"]
+
+        expected = set([r"HKEY_CLASSES_ROOT\.386", r"HKEY_CURRENT_USER\SOFTWARE", r"HKEY_LOCAL_MACHINE\SOFTWARE", 
+                        r"HKEY_USERS", r"HKEY_CURRENT_CONFIG\System", r"HKCUX\SOFTWARE"])
+
+        res = self.model._remove_contained_paths(paths)
+
+        self.assertEqual(expected, res)
+
     def test_remove_contained_paths_different_hives(self):
         paths = [r"HKEY_CLASSES_ROOT\.386\PersistentHandler", r"HKEY_CLASSES_ROOT\.386", r"HKEY_CLASSES_ROOT",
                  r"HKEY_CURRENT_USER\SOFTWARE\Python\PythonCore\3.6", r"HKEY_CURRENT_USER\SOFTWARE\Python"]
@@ -225,6 +245,15 @@ class TestModel(unittest.TestCase):
 
         self.assertEqual(expected, res)
 
+    def test_remove_contained_paths_common_prefix(self):
+        paths = [r"HKEY_CLASSES_ROOT\.38", r"HKEY_CLASSES_ROOT\.386", r"HKEY_CLASSES_ROOT\.386\PersistentHandler"]
+
+        expected = set([r"HKEY_CLASSES_ROOT\.38", r"HKEY_CLASSES_ROOT\.386"])
+
+        res = self.model._remove_contained_paths(paths)
+
+        self.assertEqual(expected, res)
+
     def test_explicit_keys(self):
         tree = self.model.get_registry_tree([r"HKEY_LOCAL_MACHINE\SOFTWARE\Python\PythonCore\2.7\InstallPath"])
         expilcit_key_names = ["InstallPath", "InstallGroup"]
@@ -280,6 +309,51 @@ class TestModel(unittest.TestCase):
         with self.assertRaises(common.RgEdtException):
             self.model.add_key(key, name)
 
+    def test_add_key_invalid_name(self):
+        key = r"HKEY_LOCAL_MACHINE\SYSTEM\AddToMe"
+        name = r"Added\Path"
+        with self.assertRaises(common.RgEdtException):
+            self.model.add_key(key, name)
+        with self.assertRaises(common.RgEdtException):
+            self.model.get_registry_key_values(f"{key}\\Added")
+
+    def test_add_key_visible_in_tree(self):
+        key = r"HKEY_LOCAL_MACHINE\SYSTEM\AddToMe"
+        name = "AddedKeyInTree"
+        self.model.get_registry_tree([key])
+        self.model.add_key(key, name)
+        tree = self.model.get_registry_tree([key])
+        add_to_me = tree.get_sub_key("HKEY_LOCAL_MACHINE").get_sub_key("SYSTEM").get_sub_key("AddToMe")
+        self.assertIn(name, [sub_key.name for sub_key in add_to_me.sub_keys])
+
+    def test_external_change_visible_in_tree(self):
+        key = r"HKEY_LOCAL_MACHINE\SYSTEM\AddToMe"
+        name = "AddedExternally"
+        self.model.get_registry_tree([key])
+
+        # Modify the registry directly, not through the model
+        with registry.winreg.ConnectRegistry(None, registry.winreg.HKEY_LOCAL_MACHINE) as root_key_handle:
+            with registry.winreg.OpenKey(root_key_handle, r"SYSTEM\AddToMe", access = registry.winreg.KEY_WRITE) as sub_key_handle:
+                registry.winreg.CreateKey(sub_key_handle, name).Close()
+
+        tree = self.model.get_registry_tree([key])
+        add_to_me = tree.get_sub_key("HKEY_LOCAL_MACHINE").get_sub_key("SYSTEM").get_sub_key("AddToMe")
+        self.assertIn(name, [sub_key.name for sub_key in add_to_me.sub_keys])
+
+    def test_trees_independent(self):
+        tree1 = self.model.get_registry_tree([r"HKEY_CLASSES_ROOT\.386"])
+        tree2 = self.model.get_registry_tree([r"HKEY_CLASSES_ROOT\.386", r"HKEY_CLASSES_ROOT\.486"])
+        tree2_xml = tree2.to_xml()
+
+        # Cache the fingerprints before the modification
+        tree1.fingerprint
+        tree2.fingerprint
+
+        tree1.get_sub_key("HKEY_CLASSES_ROOT").get_sub_key(".386").add_value(common.RegistryValue("added", "", registry.winreg.REG_SZ))
+
+        self.assertEqual(tree1, xml_to_key(tree1.to_xml()))
+        self.assertEqual(tree2, xml_to_key(tree2_xml))
+
     def test_delete_value(self):
         key = r"HKEY_LOCAL_MACHINE\SYSTEM\DeleteMe"
         name = "string"
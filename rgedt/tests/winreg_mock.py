@@ -1,6 +1,7 @@
 """A mock implementation of (a subset of) winreg.
 
-The implementation is based on an XML representation of the registry.
+The implementation is based on an XML representation of the registry,
+which is loaded into an in-memory tree of dictionaries.
 
 The implementation is partial and mainly includes only functionality
 needed by the application.
@@ -70,10 +71,15 @@ License:
     OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
     SOFTWARE.
 """
-from typing import Literal, Optional, Tuple
+from __future__ import annotations
+
+from typing import Dict, List, Literal, Optional, Tuple
 from collections import namedtuple
 import xml.etree.ElementTree as ET
 import string, random
+import hashlib
+import sys
+import functools
 
 # Constants
 
@@ -90,6 +96,8 @@ _HKEY_MAPPING = {
     HKEY_USERS: "HKEY_USERS", HKEY_PERFORMANCE_DATA: "HKEY_PERFORMANCE_DATA", HKEY_CURRENT_CONFIG: "HKEY_CURRENT_CONFIG",
     HKEY_DYN_DATA: "HKEY_DYN_DATA"
 }
+# The hive names, indexed by the HKEY_* constant
+_HKEY_NAMES = (None, ) + tuple(_HKEY_MAPPING[hkey] for hkey in range(HKEY_CLASSES_ROOT, HKEY_DYN_DATA + 1))
 
 ## Access Rights        
 KEY_QUERY_VALUE                 = (1 << 0)
@@ -147,38 +155,140 @@ _TYPE_MAPPING = {
     REG_SZ:                         _TypeRecord("REG_SZ",                         str,                         str,                         ""),
     }
 
+# The type records, indexed by the REG_* constant
+_TYPE_TABLE: Tuple[Optional[_TypeRecord], ...] = tuple(_TYPE_MAPPING.get(type_const) for type_const in range(max(_TYPE_MAPPING) + 1))
+
+# The deserialization function of each type, indexed by the REG_* constant
+_TYPE_DESERIALIZERS = tuple(type_record.deserialize if type_record is not None else None for type_record in _TYPE_TABLE)
+
+# Maps the name of each type (e.g. "REG_SZ") to its REG_* constant
+_TYPE_STR_TO_ID = {type_record.type_str: type_const for type_const, type_record in _TYPE_MAPPING.items()}
+
 def _type_str_to_type(type_str: str):
-    return globals()[type_str]
+    return _TYPE_STR_TO_ID[type_str]
 
 _SEPARATOR = "\\"
 _DEFAULT_MOD_TIME = 12345678
 
+# In-memory representation of a registry value: The data as it appears in the XML, and the REG_* type constant
+_Value = namedtuple("_Value", "data type")
+
+class _Node(object):
+    """In-memory representation of a registry key.
+    
+    The sub-keys and values should only be modified via the methods of this class,
+    which keep the lists used for enumeration up to date.
+    """
+
+    __slots__ = ("subkeys", "values", "_subkey_names", "_value_items")
+
+    def __init__(self):
+        # Maps the name of each sub-key to its _Node
+        self.subkeys: Dict[str, _Node] = {}
+
+        # Maps the name of each value to its _Value
+        self.values: Dict[str, _Value] = {}
+
+        # Lazily built lists for accessing the sub-keys and values by index
+        self._subkey_names: Optional[List[str]] = None
+        self._value_items: Optional[List[Tuple[str, _Value]]] = None
+
+    @property
+    def subkey_names(self) -> List[str]:
+        """The names of the sub-keys, in enumeration order."""
+        if self._subkey_names is None:
+            self._subkey_names = list(self.subkeys)
+        return self._subkey_names
+
+    @property
+    def value_items(self) -> List[Tuple[str, _Value]]:
+        """The (name, value) pairs of the values, in enumeration order."""
+        if self._value_items is None:
+            self._value_items = list(self.values.items())
+        return self._value_items
+
+    def add_subkey(self, name: str, node: "_Node") -> None:
+        """Add a sub-key with the given name."""
+        self.subkeys[name] = node
+        self._subkey_names = None
+
+    def set_value(self, name: str, value: _Value) -> None:
+        """Add a value with the given name, or replace the existing one."""
+        self.values[name] = value
+        self._value_items = None
+
+    def delete_value(self, name: str) -> Optional[_Value]:
+        """Delete the value with the given name. Returns the deleted value, or None if there was no such value."""
+        self._value_items = None
+        return self.values.pop(name, None)
+
 __registry = None
 
+# The registry as parsed from the most recent XML (never modified), and the digest of that XML
+__pristine_registry = None
+__pristine_digest = None
+
+# The _Node of each hive (or None if the registry doesn't contain it), indexed by the HKEY_* constant
+__hives: Tuple[Optional[_Node], ...] = ()
+
+def _node_from_xml(element: ET.Element) -> _Node:
+    """Recursively convert an XML element representing a key to a _Node."""
+    node = _Node()
+    for child in element:
+        # The same names repeat throughout the registry, intern them so that lookups can compare them by identity
+        if child.tag == "key":
+            node.add_subkey(sys.intern(child.get("name")), _node_from_xml(child))
+        elif child.tag == "value":
+            node.set_value(sys.intern(child.get("name")), _Value(child.get("data"), _type_str_to_type(child.get("type"))))
+    return node
+
+def _copy_node(node: _Node) -> _Node:
+    """Recursively copy a _Node. Values are immutable and therefore shared."""
+    copy = _Node()
+    copy.subkeys = {name: _copy_node(subkey) for name, subkey in node.subkeys.items()}
+    copy.values = dict(node.values)
+    return copy
+
 def InitRegistry(xml) -> None:
-    global __registry
-    __registry = ET.fromstring(xml)
+    """Initialize the mock registry from its XML representation.
+
+    Any changes made to the registry since a previous initialization are discarded.
+    Initializing the registry again with the same XML doesn't parse it again, 
+    a fresh copy of the previously parsed registry is used instead.
+    """
+    global __pristine_registry, __pristine_digest
+    digest = hashlib.blake2b(xml.encode() if isinstance(xml, str) else xml).digest()
+    if __pristine_registry is None or digest != __pristine_digest:
+        __pristine_registry = _node_from_xml(ET.fromstring(xml))
+        __pristine_digest = digest
+    _install_registry(_copy_node(__pristine_registry))
+
+def _install_registry(root: _Node) -> None:
+    """Use the given tree as the mock registry, and install the API functions."""
+    global __registry, __hives
+    __registry = root
+    __hives = tuple(__registry.subkeys.get(name) if name is not None else None for name in _HKEY_NAMES)
+    globals().update(_API_FUNCTIONS)
 
 class PyHKEY(object):
-    def __init__(self, element: ET.Element, access: Literal[_ACCESS_RIGHTS]): 
-        self._element = element
+
+    __slots__ = ("_node", "_access", "_is_closed")
+
+    def __init__(self, node: _Node, access: Literal[_ACCESS_RIGHTS]): 
+        self._node = node
         self._access = access
         self._is_closed = False
 
     @property
-    def element(self):
+    def node(self):
         self._check_handle()
-        return self._element
+        return self._node
 
     @property
     def access(self):
         self._check_handle()
         return self._access
 
-    def is_allowed(self, action: Literal[_ACCESS_RIGHTS]):
-        self._check_handle()
-        return self.access & action
-
     def _check_handle(self):
         if self._is_closed:
             raise OSError("The handle is invalid")
@@ -201,205 +311,118 @@ class PyHKEY(object):
     def __eq__(self, other):
         if not isinstance(other, PyHKEY):
             return False
-        return self.element == other.element and self.access == other.access
+        return self.node is other.node and self.access == other.access
 
 
 def ConnectRegistry(computer_name: Optional[str], key: Literal[_HKEY_MAPPING.keys()]) -> PyHKEY:
-    if __registry is None:
-        raise RuntimeError("Please initialize the registry first via InitRegistry()")
-
     if computer_name is not None:
         raise NotImplementedError("Specifying a computer name isn't implemented, please use None instead")
 
-    try:
-        key_str = _HKEY_MAPPING[key]
-        element = __registry.find(f"./key[@name='{key_str}']")
-        if element is None:
-            raise OSError(f"Registry does not contain '{key_str}' key")
-        return PyHKEY(element, access = KEY_READ)
-    except KeyError as e:
-        raise OSError("Handle is invalid") from e
-    except OSError as e:
-        raise e
-    except Exception as e:
-        raise OSError("General Error") from e
+    if not key in _HKEY_MAPPING:
+        raise OSError("Handle is invalid")
 
-def CreateKey(key: PyHKEY, sub_key: str) -> PyHKEY:
-    if __registry is None:
-        raise RuntimeError("Please initialize the registry first via InitRegistry()")
+    node = __hives[key]
+    if node is None:
+        raise OSError(f"Registry does not contain '{_HKEY_NAMES[key]}' key")
+    return PyHKEY(node, access = KEY_READ)
 
-    if not key.is_allowed(KEY_CREATE_SUB_KEY):
+def CreateKey(key: PyHKEY, sub_key: str) -> PyHKEY:
+    if not (key.access & KEY_CREATE_SUB_KEY):
         raise PermissionError("Access is denied")
 
-    if "\\" in sub_key:
-        raise ValueError("Forbidden characters in key name")
-
-    handle = None
-    subkey_names = sub_key.split(_SEPARATOR)
-    missing_subkey_names = []
-    while len(subkey_names) > 0:
-        try:
-            handle = OpenKey(key, _SEPARATOR.join(subkey_names), access = KEY_ALL_ACCESS)
-            break
-        except OSError:
-            missing_subkey_names.insert(0, subkey_names.pop())
-    
-    # handle is innermost existing key
-
-    if len(missing_subkey_names) == 0:
-        assert(handle is not None)
-        return handle
-
-    if handle is None:
-        handle = PyHKEY(key.element, access = KEY_ALL_ACCESS)
-
-    try:
-        while (len(missing_subkey_names) > 0):
-            current_name = missing_subkey_names.pop(0)
-            subkey_elem = ET.SubElement(handle.element, "key", name = current_name)
-            handle.Close()
-            handle = PyHKEY(subkey_elem, access = KEY_ALL_ACCESS)
-        return handle
-    except OSError as e:
-        raise e
-    except Exception as e:
-        raise OSError("General Error") from e
+    # Walk down the path once, creating any missing keys along the way
+    node = key.node
+    for sk in _split_sub_key(sub_key):
+        subkey_node = node.subkeys.get(sk)
+        if subkey_node is None:
+            subkey_node = _Node()
+            node.add_subkey(sk, subkey_node)
+        node = subkey_node
+    return PyHKEY(node, access = KEY_ALL_ACCESS)
+
+@functools.lru_cache(maxsize = 1024)
+def _split_sub_key(sub_key: str) -> Tuple[str, ...]:
+    """Split a sub-key path into the names of the keys along it."""
+    return tuple(sub_key.split(_SEPARATOR)) if sub_key != "" else ()
 
 def OpenKey(key: PyHKEY, sub_key: str, reserved = 0, access: Literal[_ACCESS_RIGHTS] = KEY_READ) -> PyHKEY:
-    if __registry is None:
-        raise RuntimeError("Please initialize the registry first via InitRegistry()")
-
-    try:
-        if sub_key == "":
-            return PyHKEY(key.element, access = access)
-        xpath = "/".join(f"key[@name='{sk}']" for sk in sub_key.split(_SEPARATOR))
-        element = key.element.find(xpath)
-        if element is None:
+    node = key.node
+    for sk in _split_sub_key(sub_key):
+        node = node.subkeys.get(sk)
+        if node is None:
             raise OSError(f"Registry does not contain '{sub_key}' path under provided key")
-        return PyHKEY(element, access = access)
-    except OSError as e:
-        raise e
-    except Exception as e:
-        raise OSError("General Error") from e
+    return PyHKEY(node, access = access)
 
 def QueryInfoKey(key: PyHKEY) -> Tuple[int, int, int]:
-    if __registry is None:
-        raise RuntimeError("Please initialize the registry first via InitRegistry()")
-
-    if not key.is_allowed(KEY_QUERY_VALUE):
+    if not (key.access & KEY_QUERY_VALUE):
         raise PermissionError("Access is denied")
 
-    try:
-        num_sub_keys = len(key.element.findall("./key"))
-        num_values = len(key.element.findall("./value"))
-        mod_date = _DEFAULT_MOD_TIME
-        return (num_sub_keys, num_values, mod_date)
-    except OSError as e:
-        raise e
-    except Exception as e:
-        raise OSError("General Error") from e
+    node = key.node
+    return (len(node.subkeys), len(node.values), _DEFAULT_MOD_TIME)
 
 def EnumKey(key: PyHKEY, index: int) -> str:
-    if __registry is None:
-        raise RuntimeError("Please initialize the registry first via InitRegistry()")
-
-    if not key.is_allowed(KEY_ENUMERATE_SUB_KEYS):
+    if not (key.access & KEY_ENUMERATE_SUB_KEYS):
         raise PermissionError("Access is denied")
 
-    try:
-        return key.element.find(f"./key[{index + 1}]").get("name")
-    except OSError as e:
-        raise e
-    except Exception as e:
-        raise OSError("General Error") from e
+    subkey_names = key.node.subkey_names
+    if not 0 <= index < len(subkey_names):
+        raise OSError("No more data is available")
+    return subkey_names[index]
 
 def EnumValue(key: PyHKEY, index: int) -> Tuple[str, object, int]:
-    if __registry is None:
-        raise RuntimeError("Please initialize the registry first via InitRegistry()")
-
-    if not key.is_allowed(KEY_QUERY_VALUE):
+    if not (key.access & KEY_QUERY_VALUE):
         raise PermissionError("Access is denied")
 
-    try:
-        value = key.element.find(f"./value[{index + 1}]")
-        name = value.get("name")
-        type_const = _type_str_to_type(value.get("type"))
-        type_record = _TYPE_MAPPING[type_const]
-        data = value.get("data")
-        return (name, type_record.deserialize(data), type_const)
-    except OSError as e:
-        raise e
-    except Exception as e:
-        raise OSError("General Error") from e
+    value_items = key.node.value_items
+    if not 0 <= index < len(value_items):
+        raise OSError("No more data is available")
+    name, value = value_items[index]
+    return (name, _TYPE_DESERIALIZERS[value.type](value.data), value.type)
 
 def SetValueEx(key: PyHKEY, value_name: str, reserved, value_type: Literal[list(_TYPE_MAPPING.keys())], value) -> None:
-    if __registry is None:
-        raise RuntimeError("Please initialize the registry first via InitRegistry()")
-
-    if not key.is_allowed(KEY_SET_VALUE):
+    if not (key.access & KEY_SET_VALUE):
         raise PermissionError("Access is denied")
 
-    if not value_type in _TYPE_MAPPING:
+    type_record = _TYPE_MAPPING.get(value_type)
+    if type_record is None:
         raise TypeError(f"Unknown type {value_type}")
 
-    type_record = _TYPE_MAPPING[value_type]
-
     try:
         serialized_value = type_record.serialize(value)
     except Exception:
         serialized_value = type_record.serialize(type_record.default)
 
-    try:
-        value_elem = key.element.find(f"./value[@name='{value_name}']")
-        if value_elem is None:
-            value_elem = ET.SubElement(key.element, "value", name = value_name, data = serialized_value, type = _TYPE_MAPPING[value_type].type_str)
-        else:
-            value_elem.set("data", serialized_value)
-            value_elem.set("type", _TYPE_MAPPING[value_type].type_str)
-    except OSError as e:
-        raise e
-    except Exception as e:
-        raise OSError("General Error") from e
+    key.node.set_value(value_name, _Value(serialized_value, value_type))
 
 def QueryValueEx(key: PyHKEY, value_name: str):
-    if __registry is None:
-        raise RuntimeError("Please initialize the registry first via InitRegistry()")
-
-    if not key.is_allowed(KEY_QUERY_VALUE):
+    if not (key.access & KEY_QUERY_VALUE):
         raise PermissionError("Access is denied")
 
-    try:
-        value_elem = key.element.find(f"./value[@name='{value_name}']")
-        if value_elem is None:
-            raise FileNotFoundError(f"Can't find {value_name} in {key}")
-
-        type_const = _type_str_to_type(value_elem.get("type"))
-        type_record = _TYPE_MAPPING[type_const]
+    value = key.node.values.get(value_name)
+    if value is None:
+        raise FileNotFoundError(f"Can't find {value_name} in {key}")
 
-        return (type_record.deserialize(value_elem.get("data")), type_const)
-    except OSError as e:
-        raise e
-    except Exception as e:
-        raise OSError("General Error") from e
+    return (_TYPE_DESERIALIZERS[value.type](value.data), value.type)
 
 def DeleteValue(key: PyHKEY, value_name: str):
-    if __registry is None:
-        raise RuntimeError("Please initialize the registry first via InitRegistry()")
-
-    if not key.is_allowed(KEY_WRITE):
+    if not (key.access & KEY_WRITE):
         raise PermissionError("Access is denied")
 
-    try:
-        value_elem = key.element.find(f"./value[@name='{value_name}']")
-        if value_elem is None:
-            raise FileNotFoundError(f"Can't find {value_name} in {key}")
+    if key.node.delete_value(value_name) is None:
+        raise FileNotFoundError(f"Can't find {value_name} in {key}")
 
-        key.element.remove(value_elem)
+# Until the registry is initialized, the API functions are replaced with stubs that raise an error.
+# InitRegistry installs the actual functions, which therefore don't need to check for it on each call.
+_API_FUNCTIONS = {func.__name__: func for func in (ConnectRegistry, CreateKey, OpenKey, QueryInfoKey, EnumKey, 
+                                                   EnumValue, SetValueEx, QueryValueEx, DeleteValue)}
+
+def _uninitialized_stub(name: str):
+    def stub(*args, **kwargs):
+        raise RuntimeError("Please initialize the registry first via InitRegistry()")
+    stub.__name__ = name
+    return stub
 
-    except OSError as e:
-        raise e
-    except Exception as e:
-        raise OSError("General Error") from e
+globals().update({name: _uninitialized_stub(name) for name in _API_FUNCTIONS})
 
 ## ------------------------------------ Tests ------------------------------------ ##
 
@@ -446,6 +469,7 @@ if __name__ == "__main__":
                 </registry>
             """
 
+            cls.registry_xml = registry
             InitRegistry(registry)
 
         @classmethod
@@ -597,5 +621,19 @@ if __name__ == "__main__":
                     with self.assertRaises(FileNotFoundError):
                         QueryValueEx(sub_handle, "delete_me")
 
+        def test_init_again_discards_changes(self):
+            for _ in range(2):
+                key = self.random_str()
+                with ConnectRegistry(None, HKEY_CURRENT_USER) as root_key_handle:
+                    with OpenKey(root_key_handle, r"System\CurrentControlSet", access = KEY_ALL_ACCESS) as sub_handle:
+                        CreateKey(sub_handle, key).Close()
+
+                InitRegistry(self.registry_xml)
+
+                with ConnectRegistry(None, HKEY_CURRENT_USER) as root_key_handle:
+                    with OpenKey(root_key_handle, r"System\CurrentControlSet") as sub_handle:
+                        with self.assertRaises(OSError):
+                            OpenKey(sub_handle, key)
+
 
     unittest.main()
\ No newline at end of file
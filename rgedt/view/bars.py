@@ -35,8 +35,14 @@ class RegistryReadOnlyBar():
 
         self.bar.config(state="readonly")
 
+        # The text currently displayed in the bar
+        self._text = ""
+
     def set_text(self, text: str) -> None:
         """Set the text to display in the bar."""
+        if text == self._text:
+            return
+        self._text = text
         self.bar.config(state="normal")
         self.bar.delete(0, tk.END)
         self.bar.insert(0, text)
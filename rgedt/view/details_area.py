@@ -35,7 +35,7 @@ import tkinter as tk
 from tkinter import simpledialog, messagebox
 from tkinter import ttk
 from collections import namedtuple
-from typing import Dict, Callable, Any, List
+from typing import Dict, Callable, Any, List, Optional, Tuple
 import importlib
 
 from .menus import *
@@ -48,12 +48,17 @@ from ..common import *
 EMPTY_NAME_TAG = 'empty_name'
 EMPTY_VALUE_TAG = 'empty_value'
 
+# Tags tuples for inserted items, shared between all items
+_NO_TAGS = ()
+_EMPTY_NAME_TAGS = (EMPTY_NAME_TAG, )
+_EMPTY_NAME_AND_VALUE_TAGS = (EMPTY_NAME_TAG, EMPTY_VALUE_TAG)
+
 class RegistryValueItem():
     """Wrapper for registry value GUI item."""
     
     DetailsItemValues = namedtuple("DetailsItemValues", "data_type data")
 
-    def __init__(self, tree: ttk.Treeview, id: str):
+    def __init__(self, tree: ttk.Treeview, id: str, row: Optional[Tuple[str, "RegistryValueItem.DetailsItemValues", Tuple[str, ...]]] = None):
         """Instantiate a registry value wrapper from an existing TreeView item.
         
         Args:
@@ -61,12 +66,17 @@ class RegistryValueItem():
                 Parent Treeview for this registry value.
             id: 
                 Treeview ID for this registry value.
+            row:
+                The (text, values, tags) the item was inserted with, if known.
+                Otherwise, they are fetched from the Treeview.
         """
             
         self._id = id
         self._tree = tree
-        self._item = self._tree.item(self._id)
-        self._item_values = self.DetailsItemValues(*self._item["values"])
+        if row is None:
+            item = self._tree.item(self._id)
+            row = (item["text"], self.DetailsItemValues(*item["values"]), tuple(item["tags"]))
+        self._text, self._item_values, self._tags = row
 
     @property
     def id(self) -> str:
@@ -78,21 +88,21 @@ class RegistryValueItem():
         """Actual name of this registry value.
            For a value tagged with an empty name, will return an empty string.
         """
-        return '' if EMPTY_NAME_TAG in self._item["tags"] else self._item["text"]
+        return '' if EMPTY_NAME_TAG in self._tags else self._text
 
     @property
     def display_name(self) -> str:
         """Display name of this registry value.
            Will return the name assigned to the registry value regardless of an 'empty name' tag.
         """
-        return self._item["text"]
+        return self._text
 
     @property
     def data(self) -> Any:
         """The actual value of the registry value.
            Will return an empty string if the value is tagged as an empty value.
         """
-        return '' if EMPTY_VALUE_TAG in self._item["tags"] else self._item_values.data
+        return '' if EMPTY_VALUE_TAG in self._tags else self._item_values.data
 
     @property
     def data_type(self) -> str:
@@ -121,6 +131,10 @@ class RegistryDetailsView():
         self.keys_view = keys_view
         self.callbacks = callbacks
 
+        self._cb_edit = callbacks[Events.EDIT_VALUE]
+        self._cb_add = callbacks[Events.ADD_VALUE]
+        self._cb_delete = callbacks[Events.DELETE_VALUE]
+
         ColumnAttr = namedtuple("ColumnAttr", "name width")
 
         columns = (ColumnAttr('Name', 200), ColumnAttr('Type', 100), ColumnAttr('Data', 500))
@@ -171,6 +185,9 @@ class RegistryDetailsView():
             "REG_QWORD_LITTLE_ENDIAN": TypeRecord(None,                                      self.binary_icon, lambda val: f"{val:#0{18}x} ({val})")
         }
 
+        # Python-side mirror of the rows in the details list: ID -> (text, values, tags)
+        self._rows: Dict[str, Tuple[str, RegistryValueItem.DetailsItemValues, Tuple[str, ...]]] = {}
+
         self.menu_item_to_winreg_data_type_str = { 
             data_type_attr.new_item_enum : data_type 
             for data_type, data_type_attr in self.data_type_attributes.items()
@@ -180,6 +197,7 @@ class RegistryDetailsView():
     def reset(self) -> None:
         """Reset the details area to its initial state."""
         self.details.delete(*self.details.get_children())
+        self._rows.clear()
 
     @property
     def widget(self) -> ttk.Treeview:
@@ -199,38 +217,29 @@ class RegistryDetailsView():
             data_type:
                 Type of the registry value, as string (e.g. "REG_SZ")
         """
-        tags = []
+        tags = _NO_TAGS
         
         if name == '':
-            tags.append(EMPTY_NAME_TAG)
+            tags = _EMPTY_NAME_TAGS
             name = '(Default)'
 
             if data == '':
-                tags.append(EMPTY_VALUE_TAG)
+                tags = _EMPTY_NAME_AND_VALUE_TAGS
                 data = '(value not set)'
         
         display_data = self.data_type_attributes[data_type].display_format(data)
+        values = RegistryValueItem.DetailsItemValues(data_type, display_data)
 
-        self.details.insert('', 'end', values = RegistryValueItem.DetailsItemValues(data_type, display_data), tags = tuple(tags),
-                            image = self.data_type_attributes[data_type].icon, 
-                            text = name)
-
-    def _sort(self) -> None:
-        """Sort the registry values.
-        
-        Values sorted in a case insensitive, manner.
-        Default value appears first.
-        """
-        rows = [(RegistryValueItem(self.details, item, ) ) for item in self.details.get_children('')]
-        rows.sort(key = lambda reg_value_item: reg_value_item.name.lower())
-
-        for index, (reg_value_item) in enumerate(rows):
-            self.details.move(reg_value_item.id, '', index)
+        iid = self.details.insert('', 'end', values = values, tags = tags,
+                                  image = self.data_type_attributes[data_type].icon, 
+                                  text = name)
+        self._rows[iid] = (name, values, tags)
 
     @property
     def selected_item(self) -> RegistryValueItem:
         """Return the currently selected item."""
-        return RegistryValueItem(self.details, self.details.selection()[0])
+        iid = self.details.selection()[0]
+        return RegistryValueItem(self.details, iid, self._rows.get(iid))
 
     def _popup_edit_value_window(self, event) -> None:
         """Pop-up the "Edit Value" window."""
@@ -242,10 +251,10 @@ class RegistryDetailsView():
             edit_value_class = EditValueView.from_type(selected_item.data_type)
 
             # This callback is called when the user actually edits the value
-            edit_value_callback = lambda new_value: self.callbacks[Events.EDIT_VALUE](self.keys_view.selected_item.path, 
-                                                                                      selected_item.name,
-                                                                                      selected_item.data_type,
-                                                                                      new_value)
+            edit_value_callback = lambda new_value: self._cb_edit(self.keys_view.selected_item.path, 
+                                                                  selected_item.name,
+                                                                  selected_item.data_type,
+                                                                  new_value)
 
             # This callback is called when the application wants to show the "edit value" dialog
             edit_value_dialog = lambda data: edit_value_class(self.parent, 
@@ -265,7 +274,7 @@ class RegistryDetailsView():
         delete_value = messagebox.askyesno("Delete Value", "Are you sure you want to delete this value?")
         if delete_value:
             try:
-                self.callbacks[Events.DELETE_VALUE](self.keys_view.selected_item.path, self.selected_item.name)
+                self._cb_delete(self.keys_view.selected_item.path, self.selected_item.name)
             except Exception as e:
                 self.callbacks[Events.SHOW_ERROR](f"Could not delete value\n({str(e)})")
 
@@ -273,6 +282,9 @@ class RegistryDetailsView():
         """Given a list of registry values, show them.
 
         If the default value does not already exist, adds it (same behavior as regedit).
+
+        Values are sorted in a case insensitive manner, default value appears first.
+        They are sorted before being inserted, so no items need to be moved afterwards.
         
         Args:
             value:
@@ -284,10 +296,8 @@ class RegistryDetailsView():
         if not any(value.name == '' for value in values):
             values.insert(0, RegistryValue('', '', registry.winreg.REG_SZ))
 
-        for value in values:
+        for value in sorted(values, key = lambda value: value.name.lower()):
             self._add_entry(value.name, value.data, value.data_type.name)
-        
-        self._sort()
 
     def _show_menu(self, event) -> None:
         """Show the appropriate menu based on the user interaction.
@@ -335,9 +345,9 @@ class RegistryDetailsView():
                 return
 
             try:
-                self.callbacks[Events.ADD_VALUE](self.keys_view.selected_item.path, 
-                                                value_name,
-                                                data_type,
-                                                '')
+                self._cb_add(self.keys_view.selected_item.path, 
+                             value_name,
+                             data_type,
+                             '')
             except Exception as e:
                 self.callbacks[Events.SHOW_ERROR](str(e))
\ No newline at end of file
@@ -92,16 +92,8 @@ class EditValueView():
         Returns:
             The appropriate "Edit Window" class based on the given type.
         """
-        factory_var = "_FACTORY"
-        if not hasattr(cls, factory_var):
-            setattr(cls, factory_var, {
-                "REG_SZ": EditStringView,
-                "REG_DWORD": EditDwordView,
-                "REG_DWORD_LITTLE_ENDIAN": EditDwordView,
-            })
-
         try:
-            return getattr(cls, factory_var)[type]
+            return _EDIT_VIEW_BY_TYPE[type]
         except KeyError as e:
             raise ValueError(f"Can't create appropriate 'change value' view for '{type}'") from e
 
@@ -354,3 +346,10 @@ class EditDwordView(EditValueView):
             return True
         except ValueError as e:
             return False
+
+# The "Edit Window" class for each registry value type, see EditValueView.from_type()
+_EDIT_VIEW_BY_TYPE = {
+    "REG_SZ": EditStringView,
+    "REG_DWORD": EditDwordView,
+    "REG_DWORD_LITTLE_ENDIAN": EditDwordView,
+}
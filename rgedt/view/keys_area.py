@@ -37,7 +37,7 @@ from tkinter import simpledialog
 from tkinter import ttk
 import importlib
 
-from typing import Dict, Callable
+from typing import Dict, Callable, List, Optional, Tuple
 from pathlib import Path
 
 from .bars import *
@@ -47,21 +47,35 @@ from ..common import *
 
 EXPLICIT_TAG = 'explicit'
 IMPLICIT_TAG = 'implicit'
+PLACEHOLDER_TAG = 'placeholder'
+
+# Tags tuples for inserted items, shared between all items
+_EXPLICIT_TAGS = (EXPLICIT_TAG, )
+_IMPLICIT_TAGS = (IMPLICIT_TAG, )
+_PLACEHOLDER_TAGS = (PLACEHOLDER_TAG, )
+
+# Maximum number of keys inserted into the tree before yielding to the event loop
+BUILD_CHUNK_SIZE = 500
+
+# Delay (in milliseconds) before handling a key selection, so that a burst of selections is handled once
+SELECT_DELAY_MS = 50
 
 class RegistryKeyItem():
     """Wrapper for registry key GUI item."""
-    def __init__(self, tree: ttk.Treeview, id: str):
+    def __init__(self, tree: ttk.Treeview, id: str, is_explicit: Optional[bool] = None):
         """Instantiate a registry key.
         
         Args:
             tree:
                 Parent Treeview for this registry key.
             id: 
-                Treeview ID for this registry key.
+                Treeview ID for this registry key, which is its full registry path.
+            is_explicit:
+                Whether the key is explicit, if already known.
         """
         self._id = id
         self._tree = tree
-        self._item = self._tree.item(self._id)
+        self._is_explicit = is_explicit
 
     @property
     def id(self) -> str:
@@ -71,21 +85,14 @@ class RegistryKeyItem():
     @property
     def path(self) -> str:
         """Full registry path up to this key."""
-        path = []
-        path.append(self._item["text"])
-        current_item: str = self._id
-
-        while (parent := self._tree.parent(current_item)) != "":
-            tree_item = self._tree.item(parent)
-            path.append(tree_item["text"])
-            current_item = parent
-
-        return REGISTRY_PATH_SEPARATOR.join(reversed(path))
+        return self._id
 
     @property
     def is_explicit(self) -> bool:
         """Was this key explicitly filtered-in by the user?"""
-        return EXPLICIT_TAG in self._item["tags"]
+        if self._is_explicit is None:
+            self._is_explicit = EXPLICIT_TAG in self._tree.item(self._id, "tags")
+        return self._is_explicit
 
 class RegistryKeysView():
     """Implements the view for the key area."""
@@ -108,78 +115,234 @@ class RegistryKeysView():
         self.callbacks = callbacks
         self.address_bar = address_bar
 
+        # Called for every selection, so looked up once
+        self._cb_key_selected = callbacks[Events.KEY_SELECTED]
+
         self.wrapper = ttk.Frame(parent)
 
         self.tree = ttk.Treeview(self.wrapper, show = 'tree', selectmode = 'browse')
         self.tree.pack(side = tk.LEFT, fill = tk.BOTH, expand=True)
         self.tree.bind('<<TreeviewSelect>>', self._registry_key_selected)
-        self.tree.tag_configure(IMPLICIT_TAG, foreground = 'gray')
+        self.tree.bind('<<TreeviewOpen>>', self._registry_key_opened)
+        self.tree.bind('<Map>', self._late_init, add = '+')
+
+        # Whether _late_init already styled the tree
+        self._styled = False
+
+        # Keys whose child items weren't inserted into the tree yet, by Treeview ID
+        self._pending_keys: Dict[str, RegistryKey] = {}
+
+        # Whether the key of each item in the tree is explicit, by Treeview ID
+        self._explicit_items: Dict[str, bool] = {}
+
+        # The RegistryKeyItem for the most recently selected item
+        self._selected_item: Optional[RegistryKeyItem] = None
+
+        # ID of the scheduled call to _dispatch_select, if any
+        self._pending_select: Optional[str] = None
+
+        # Keys still waiting to be inserted into the tree, together with the TreeView ID of their parent item.
+        # Children are pushed in reverse so that they are popped (and inserted) in order.
+        self._build_stack: List[Tuple[RegistryKey, str]] = []
+
+        # ID of the scheduled call to _build_chunk, if any
+        self._pending_build: Optional[str] = None
 
         self.vsb = ttk.Scrollbar(self.wrapper, orient = tk.VERTICAL, command = self.tree.yview)
         self.vsb.pack(side = tk.RIGHT, fill = tk.Y)
 
         self.tree.configure(yscrollcommand = self.vsb.set)
 
-        self.fix_tkinter_color_tags()
-
         self.folder_img = tk.PhotoImage(data = importlib.resources.read_binary(f"{__package__}.assets", "folder.png"))
         self.computer_img = tk.PhotoImage(data = importlib.resources.read_binary(f"{__package__}.assets", "computer.png"))
 
     def reset(self) -> None:
         """Reset the key area to its initial state."""
+        self._cancel_pending_select()
+        if self._pending_build is not None:
+            self.tree.after_cancel(self._pending_build)
+            self._pending_build = None
+        self._build_stack.clear()
         self.tree.delete(*self.tree.get_children())
+        self._pending_keys.clear()
+        self._explicit_items.clear()
+        self._selected_item = None
 
     @property
     def widget(self) -> ttk.Treeview:
         """Return the actual widget."""
         return self.wrapper
 
+    def _late_init(self, event) -> None:
+        """Style the tree once it is first displayed."""
+        # <Map> is sent whenever the tree is shown again, and unbind() would remove 
+        # every <Map> binding of the widget, so the handler stays bound instead
+        if self._styled:
+            return
+        self._styled = True
+        self.fix_tkinter_color_tags()
+        self.tree.tag_configure(IMPLICIT_TAG, foreground = 'gray')
+
     def fix_tkinter_color_tags(self) -> None:
-        """A W/A to allow tkinter to display a TreeView's foreground/background."""
-        def fixed_map(option):
+        """A W/A to allow tkinter to display a TreeView's foreground/background.
+        
+        The style is shared by all Treeviews of the same Tcl interpreter, so the W/A 
+        is only applied if the style of this tree's interpreter wasn't fixed yet.
+        """
+        def fixed_map(style_map):
             # Fix for setting text colour for Tkinter 8.6.9
             # From: https://core.tcl.tk/tk/info/509cafafae
             #
-            # Returns the style map for 'option' with any styles starting with
+            # Returns the given style map with any styles starting with
             # ('!disabled', '!selected', ...) filtered out.
 
             # style.map() returns an empty list for missing options, so this
             # should be future-safe.
-            return [elm for elm in style.map('Treeview', query_opt=option) if
+            return [elm for elm in style_map if
             elm[:2] != ('!disabled', '!selected')]
 
-        style = ttk.Style()
-        style.map('Treeview', foreground = fixed_map('foreground'), background = fixed_map('background'))
+        # Query the style of the tree's own interpreter, not of the default root
+        style = ttk.Style(self.tree)
+        current_maps = {option: style.map('Treeview', query_opt = option) for option in ('foreground', 'background')}
+        fixed_maps = {option: fixed_map(style_map) for option, style_map in current_maps.items()}
+        if fixed_maps == current_maps:
+            # Nothing to filter out, the style was already fixed
+            return
+        style.map('Treeview', **fixed_maps)
 
     def build_registry_tree(self, key: RegistryKey, tree_parent: str) -> None:
         """Populate the key area with a registry tree.
-        
-        This method is recursive.
+
+        The child items of explicit keys are only inserted when the user 
+        expands the key, until then a placeholder child is inserted instead.
+
+        Each key item uses its full registry path as its TreeView ID.
+
+        Up to BUILD_CHUNK_SIZE keys are inserted immediately, the rest are 
+        inserted in chunks when the application is idle.
         
         Args:
             key:
-                The current key to insert into the tree.
+                The key to insert into the tree, together with the keys under it.
                 
             tree_parent:
                 TreeView ID for parent item.
         
         """
+        self._build_stack.append((key, tree_parent))
+        self._insert_keys(BUILD_CHUNK_SIZE)
+        self._schedule_build()
+
+    def _schedule_build(self) -> None:
+        """Schedule a call to _build_chunk if keys are pending and no call is already scheduled."""
+        if len(self._build_stack) > 0 and self._pending_build is None:
+            self._pending_build = self.tree.after_idle(self._build_chunk)
+
+    def _build_chunk(self) -> None:
+        """Insert the next chunk of pending keys into the tree, and schedule the following one if needed."""
+        self._pending_build = None
+        self._insert_keys(BUILD_CHUNK_SIZE)
+        self._schedule_build()
+
+    def _finish_build(self) -> None:
+        """Insert all the pending keys into the tree right away."""
+        if self._pending_build is not None:
+            self.tree.after_cancel(self._pending_build)
+            self._pending_build = None
+        self._insert_keys(len(self._build_stack))
+
+    def _insert_keys(self, budget: int) -> None:
+        """Insert pending keys into the tree.
+
+        Args:
+            budget:
+                Maximum number of keys to insert. Inserting a key might add its 
+                child keys to the pending keys, so more keys might remain.
+        """
+        insert = self.tree.insert
+        stack = self._build_stack
+        explicit_items = self._explicit_items
+
+        while (len(stack) > 0 and budget > 0):
+            budget -= 1
+            key, tree_parent = stack.pop()
+            tags = _EXPLICIT_TAGS if key.is_explicit else _IMPLICIT_TAGS
+            is_pending = key.is_explicit and len(key.sub_keys) > 0
+            sub_tree = insert(tree_parent, 'end', self._item_id(tree_parent, key.name), 
+                              text = key.name, open = not is_pending, tags = tags, 
+                              image = self.folder_img if tree_parent != '' else self.computer_img)
+            explicit_items[sub_tree] = key.is_explicit
+            if is_pending:
+                insert(sub_tree, 'end', tags = _PLACEHOLDER_TAGS)
+                self._pending_keys[sub_tree] = key
+            else:
+                stack.extend((subkey, sub_tree) for subkey in reversed(key.sub_keys))
+
+    @staticmethod
+    def _item_id(tree_parent: str, name: str) -> str:
+        """Return the TreeView ID for a new key item, i.e. its full registry path.
+
+        Args:
+            tree_parent:
+                TreeView ID of the parent item.
+
+            name:
+                Name of the key represented by the item.
+        """
+        if tree_parent == '':
+            return name
+        return tree_parent + REGISTRY_PATH_SEPARATOR + name
+
+    def _insert_pending_children(self, tree_item: str) -> None:
+        """Replace the placeholder child of the given item with the actual child items, if needed.
+
+        Args:
+            tree_item:
+                TreeView ID of the item.
+        """
+        key = self._pending_keys.pop(tree_item, None)
+        if key is not None:
+            self.tree.delete(*self.tree.get_children(tree_item))
+            self._build_stack.extend((subkey, tree_item) for subkey in reversed(key.sub_keys))
+            self._insert_keys(BUILD_CHUNK_SIZE)
+            self._schedule_build()
 
-        tag = EXPLICIT_TAG if key.is_explicit else IMPLICIT_TAG
-        sub_tree = self.tree.insert(tree_parent, 'end', text = key.name, open = True, tags = (tag, ), 
-                                    image = self.folder_img if tree_parent != '' else self.computer_img)
-        for subkey in key.sub_keys:
-            self.build_registry_tree(subkey, sub_tree)
+    def _registry_key_opened(self, event) -> None:
+        """Handle an event where the user expands a key."""
+        self._insert_pending_children(self.tree.focus())
 
     @property
     def selected_item(self) -> RegistryKeyItem:
         """Return the currently selected item."""
-        return RegistryKeyItem(self.tree, self.tree.selection()[0])
+        selected_id = self.tree.selection()[0]
+        if self._selected_item is None or self._selected_item.id != selected_id:
+            self._selected_item = RegistryKeyItem(self.tree, selected_id, self._explicit_items.get(selected_id))
+        return self._selected_item
+
+    def _cancel_pending_select(self) -> None:
+        """Cancel the scheduled handling of a key selection, if any."""
+        if self._pending_select is not None:
+            self.tree.after_cancel(self._pending_select)
+            self._pending_select = None
 
     def _registry_key_selected(self, event) -> None:
-        """Handle an event where the user selects a key."""
-        selected_item = self.selected_item
-        self.callbacks[Events.KEY_SELECTED](selected_item.path, selected_item.is_explicit)
+        """Handle an event where the user selects a key.
+        
+        The actual handling is delayed, so that quickly moving through the
+        keys (e.g. holding down an arrow key) only loads the last one.
+        """
+        self._cancel_pending_select()
+        self._pending_select = self.tree.after(SELECT_DELAY_MS, self._dispatch_select)
+
+    def _dispatch_select(self) -> None:
+        """Notify about the currently selected key."""
+        self._pending_select = None
+        try:
+            selected_item = self.selected_item
+        except IndexError:
+            # Selection was cleared in the meantime
+            return
+        self._cb_key_selected(selected_item.path, selected_item.is_explicit)
         self.address_bar.set_address(selected_item.path)
 
     def enable_test_mode(self) -> None:
@@ -199,6 +362,14 @@ class RegistryKeysView():
         if key_name:
             try:
                 self.callbacks[Events.ADD_KEY](self.selected_item.path, key_name)
-                self.tree.insert(self.selected_item.id, 'end', text = key_name, open = True, image = self.folder_img, tags = (EXPLICIT_TAG, ))
+                self._insert_pending_children(self.selected_item.id)
+                # The new key goes after the existing ones
+                self._finish_build()
+                new_item = self.tree.insert(self.selected_item.id, 'end', self._item_id(self.selected_item.id, key_name), 
+                                            text = key_name, open = True, image = self.folder_img, tags = _EXPLICIT_TAGS)
+                self._explicit_items[new_item] = True
+                # Explicit keys with sub-keys are inserted collapsed, make sure the new key is visible
+                self.tree.item(self.selected_item.id, open = True)
+                self.tree.see(new_item)
             except Exception as e:
                 self.callbacks[Events.SHOW_ERROR](f"Could not add key\n({str(e)})")
\ No newline at end of file